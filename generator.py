@@ -1,7 +1,187 @@
 import string
 import secrets
-import math
 import os
+from functools import lru_cache
+from types import SimpleNamespace
+
+import numpy as np
+
+
+@lru_cache(maxsize=4096)
+def _simple_vector(word):
+    """Создает простое векторное представление слова.
+
+    Представляет слово в виде вектора длиной 26, содержащего
+    нормализованные частоты букв латинского алфавита. Результат
+    кешируется для каждого слова, поэтому возвращаемый массив
+    доступен только для чтения.
+
+    Args:
+        word: Исходное слово, для которого строится вектор.
+
+    Returns:
+        numpy.ndarray: Нормализованный вектор длиной 26 (float32).
+    """
+    # Берем только ASCII-байты и оставляем из них латинские буквы
+    codes = np.frombuffer(word.lower().encode('ascii', 'ignore'), dtype=np.uint8)
+    codes = codes[(codes >= ord('a')) & (codes <= ord('z'))]
+    vector = np.bincount(codes - ord('a'), minlength=26).astype(np.float32)
+    
+    # Нормализуем вектор
+    length = np.linalg.norm(vector)
+    if length > 0:
+        vector /= length
+    
+    vector.flags.writeable = False
+    return vector
+
+
+@lru_cache(maxsize=None)
+def _sampling_tables(alphabet):
+    """Строит таблицы для равномерной выборки символов из случайных байтов.
+
+    Байты из "хвоста" диапазона, не кратного длине алфавита, отбрасываются,
+    чтобы остаток от деления не смещал распределение символов.
+
+    Args:
+        alphabet: Алфавит в виде bytes длиной от 1 до 256.
+
+    Returns:
+        tuple[bytes, bytes]: Таблица для bytes.translate, отображающая
+        байт в символ алфавита, и набор отбрасываемых байтов.
+    """
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytes(alphabet[b % size] for b in range(256))
+    rejected = bytes(range(limit, 256))
+    return table, rejected
+
+
+def _random_chars(alphabet, count):
+    """Возвращает count случайных символов алфавита.
+
+    Случайные байты берутся из secrets.token_bytes крупными блоками
+    и отображаются в алфавит одним вызовом bytes.translate.
+
+    Args:
+        alphabet: Алфавит в виде bytes.
+        count: Количество символов.
+
+    Returns:
+        bytes: Строка из count равномерно распределенных символов алфавита.
+    """
+    table, rejected = _sampling_tables(alphabet)
+    
+    result = b''
+    while len(result) < count:
+        result += secrets.token_bytes(count - len(result)).translate(table, rejected)
+    return result
+
+
+# Замены букв на цифры и таблицы str.translate для всех их подмножеств:
+# бит i маски включает i-ю замену
+_LEET = (('a', '4'), ('e', '3'), ('i', '1'), ('o', '0'), ('s', '5'), ('t', '7'))
+_LEET_TABLES = tuple(
+    str.maketrans({letter: digit
+                   for bit, (old, digit) in enumerate(_LEET) if mask >> bit & 1
+                   for letter in (old, old.upper())})
+    for mask in range(1 << len(_LEET))
+)
+
+
+@lru_cache(maxsize=4096)
+def _letter_set(word):
+    """Возвращает множество букв слова без учета регистра.
+
+    Учитываются любые символы, а не только латиница, поэтому общие
+    буквы находятся и у слов из пользовательского словаря на кириллице.
+
+    Args:
+        word: Исходное слово.
+
+    Returns:
+        frozenset[str]: Множество символов слова в нижнем регистре.
+    """
+    return frozenset(word.lower())
+
+
+def _letter_masks(letter_sets, alphabet):
+    """Строит битовые маски букв для набора слов.
+
+    Args:
+        letter_sets: Последовательность множеств букв слов (см. _letter_set).
+        alphabet: Словарь символ -> номер бита. Символы, которых в нем
+            нет, в маску не попадают.
+
+    Returns:
+        numpy.ndarray: Массив uint64 формы (N, W), где W - число 64-битных
+        слов, нужное для алфавита; бит i установлен, если в слове есть
+        символ с номером i.
+    """
+    width = max(1, -(-len(alphabet) // 64))
+    masks = b''.join(
+        sum(1 << alphabet[char] for char in letters if char in alphabet)
+        .to_bytes(width * 8, 'little')
+        for letters in letter_sets
+    )
+    return np.frombuffer(masks, dtype='<u8').reshape(len(letter_sets), width)
+
+
+def _score_candidates(similarity, theme_len, theme_letters, theme_mask,
+                      word_lens, word_letters, word_masks):
+    """Оценивает близость темы сразу к набору слов.
+
+    Векторизованный аналог PasswordGenerator._semantic_distance:
+    складывает косинусное сходство, близость длин и долю общих
+    букв с теми же весами, но без цикла по словам на Python.
+    Общие буквы считаются через popcount битовых масок.
+
+    Args:
+        similarity: Массив косинусных сходств слов с темой (N).
+        theme_len: Длина тематического слова.
+        theme_letters: Количество разных букв тематического слова.
+        theme_mask: Битовая маска букв тематического слова (W).
+        word_lens: Массив длин слов (N).
+        word_letters: Массив количеств разных букв слов (N).
+        word_masks: Массив битовых масок букв слов (N x W).
+
+    Returns:
+        numpy.ndarray: Оценки близости от 0 до 1 для каждого слова.
+    """
+    length_factor = 1 - np.abs(word_lens - theme_len) / np.maximum(word_lens, max(theme_len, 1))
+    
+    common_letters = np.bitwise_count(word_masks & theme_mask).sum(axis=-1)
+    max_letters = np.maximum(word_letters, max(theme_letters, 1))
+    common_factor = common_letters / max_letters
+    
+    return similarity * 0.5 + length_factor * 0.3 + common_factor * 0.2
+
+
+def _ranked_order(scores, k):
+    """Перебирает позиции оценок по убыванию, сортируя их по мере надобности.
+
+    Сначала выдаются k лучших позиций (вместе с равными им на границе):
+    их отбор через np.argpartition занимает линейное время, и сортировать
+    приходится только их. Остальные позиции сортируются, лишь если перебор
+    до них дошел. Порядок совпадает со стабильной сортировкой всех оценок.
+
+    Args:
+        scores: Массив оценок.
+        k: Сколько лучших позиций отобрать в первую очередь.
+
+    Yields:
+        int: Позиции в массиве scores от большей оценки к меньшей.
+    """
+    if 0 < k < scores.size:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        head = scores >= threshold
+        parts = (np.flatnonzero(head), np.flatnonzero(~head))
+    else:
+        parts = (np.arange(scores.size),)
+    
+    for part in parts:
+        yield from part[np.argsort(-scores[part], kind='stable')]
+
 
 class PasswordGenerator:
     """Генератор паролей разных типов.
@@ -9,6 +189,23 @@ class PasswordGenerator:
     Поддерживает генерацию сегментированных, произносимых и
     семантических паролей с логированием операций.
     """
+    __slots__ = ('logs', 'base_path', 'word_list', '_index')
+
+    # Алфавиты сегментированных паролей
+    _CHARSET_BASIC = (string.ascii_letters + string.digits).encode()
+    _CHARSET_FULL = _CHARSET_BASIC + string.punctuation.encode()
+
+    # Гласные и согласные произносимых паролей
+    _VOWELS = b'aeiou'
+    _CONSONANTS = b'bcdfghjklmnpqrstvwxyz'
+
+    # Разделители слов семантического пароля
+    _SEPARATORS = ('-', '_', '.', '', '+', '=')
+
+    # Латинские буквы и все остальные байты (для проверки через bytes.translate)
+    _LETTERS = string.ascii_letters.encode()
+    _NON_LETTERS = bytes(b for b in range(256) if chr(b) not in string.ascii_letters)
+
     def __init__(self, logs, base_path='.', word_list_file=None):
         """Инициализирует генератор паролей.
 
@@ -22,7 +219,8 @@ class PasswordGenerator:
         """
         self.logs = logs
         self.base_path = base_path
-        self.word_vectors = {}
+        self.word_list = None
+        self._index = None
         
         if word_list_file:
             # Создаем полный путь к файлу слов
@@ -59,26 +257,32 @@ class PasswordGenerator:
         Returns:
             str: Сгенерированный пароль вида ``XXXX-YYYY-ZZZZ`` и т.п.
         """
-        if include_special:
-            charset = string.ascii_letters + string.digits + string.punctuation
-        else:
-            charset = string.ascii_letters + string.digits
+        charset = self._CHARSET_FULL if include_special else self._CHARSET_BASIC
         
-        password_parts = []
-        for _ in range(segments_amount):
-            segment = ''.join(secrets.choice(charset) for _ in range(segment_length))
+        # Берем случайные символы для всех сегментов за одно обращение к ГСЧ
+        chars = _random_chars(charset, segment_length * segments_amount)
+        
+        # Собираем весь пароль в одном буфере и декодируем его один раз
+        separator_bytes = separator.encode()
+        buffer = bytearray()
+        for i in range(segments_amount):
+            segment = bytearray(chars[i * segment_length:(i + 1) * segment_length])
             
             # Гарантируем наличие хотя бы одной буквы в каждом сегменте
-            if not any(c.isalpha() for c in segment):
+            # (если после удаления всех небукв ничего не осталось)
+            if not segment.translate(None, self._NON_LETTERS):
                 pos = secrets.randbelow(segment_length)
-                segment = segment[:pos] + secrets.choice(string.ascii_letters) + segment[pos+1:]
+                segment[pos] = secrets.choice(self._LETTERS)
             
-            password_parts.append(segment)
+            if i:
+                buffer += separator_bytes
+            buffer += segment
         
-        password = separator.join(password_parts)
+        password = buffer.decode()
         
-        self._log(f'Generated segmented password: {segment_length}x{segments_amount} '
-                f'with separator "{separator}"', 'generator')
+        if self.logs:
+            self._log(f'Generated segmented password: {segment_length}x{segments_amount} '
+                    f'with separator "{separator}"', 'generator')
         
         return password
 
@@ -97,24 +301,28 @@ class PasswordGenerator:
         Returns:
             str: Сгенерированный пароль с хотя бы одной буквой и цифрой в конце.
         """
-        vowels = 'aeiou'
-        consonants = 'bcdfghjklmnpqrstvwxyz'
+        # Все случайные решения и буквы берем несколькими крупными блоками
+        flags = secrets.token_bytes(syllable_count)
+        first_consonants = _random_chars(self._CONSONANTS, syllable_count)
+        syllable_vowels = _random_chars(self._VOWELS, syllable_count)
+        last_consonants = _random_chars(self._CONSONANTS, syllable_count)
         
-        password = ''
-        for _ in range(syllable_count):
-            # Начинаем с согласной (с вероятностью 75%)
-            if secrets.choice([True, True, True, False]):
-                password += secrets.choice(consonants)
-            password += secrets.choice(vowels)
+        buffer = bytearray()
+        for i, flag in enumerate(flags):
+            # Начинаем с согласной (с вероятностью 75%: не оба младших бита нулевые)
+            if flag & 0b011:
+                buffer.append(first_consonants[i])
+            buffer.append(syllable_vowels[i])
             
-            # Добавляем вторую согласную (с вероятностью 50%)
-            if secrets.choice([True, False]):
-                password += secrets.choice(consonants)
+            # Добавляем вторую согласную (с вероятностью 50%: третий бит)
+            if flag & 0b100:
+                buffer.append(last_consonants[i])
         
         # Делаем первую букву заглавной и добавляем цифру
-        password = password.capitalize() + str(secrets.randbelow(10))
+        password = buffer.decode('ascii').capitalize() + str(secrets.randbelow(10))
         
-        self._log(f'Generated readable password with {syllable_count} syllables', 'generator')
+        if self.logs:
+            self._log(f'Generated readable password with {syllable_count} syllables', 'generator')
         
         return password
 
@@ -131,13 +339,62 @@ class PasswordGenerator:
             None.
         """
         try:
+            # Читаем файл целиком и делим по пробельным символам одним вызовом
             with open(path, 'r', encoding='utf-8') as f:
-                words = [line.strip() for line in f if line.strip()]
-            self.word_list = words
+                words = f.read().split()
+            self._set_word_list(words)
             self._log(f'Loaded {len(words)} words from {path}', 'generator')
         except FileNotFoundError:
             self._log(f'Word list file {path} not found, using default', 'generator_error')
-            self.word_list = self._get_default_words()
+            self._set_word_list(self._get_default_words())
+
+
+    def _set_word_list(self, words):
+        """Устанавливает словарь для семантической генерации.
+
+        Сохраняет все слова (из них выбирается случайная тема) и строит
+        индекс по словам подходящей длины, среди которых подбираются
+        связанные с темой слова.
+
+        Args:
+            words: Последовательность слов словаря; сохраняется как кортеж.
+        """
+        self.word_list = tuple(words)
+        
+        # Исключаем слишком короткие/длинные слова, если остается хоть что-то
+        candidates = [word for word in self.word_list if 3 <= len(word) <= 8]
+        self._index = self._build_index(candidates or self.word_list)
+
+
+    def _build_index(self, words):
+        """Строит индекс словаря в виде набора параллельных массивов.
+
+        Все данные о словах хранятся по полям (структура массивов), так что
+        оценка близости к теме проходит по непрерывным массивам numpy,
+        а слова адресуются номером строки.
+
+        Args:
+            words: Последовательность слов для индексации.
+
+        Returns:
+            types.SimpleNamespace: Индекс с полями ``words`` (кортеж слов),
+            ``matrix`` (нормализованные векторы, N x 26, float32),
+            ``lengths`` (длины слов, int32), ``alphabet`` (символ -> номер
+            бита), ``letters`` (количества разных букв, int32) и ``masks``
+            (битовые маски букв, N x W, uint64).
+        """
+        matrix = np.array([_simple_vector(word) for word in words],
+                          dtype=np.float32).reshape(len(words), 26)
+        letter_sets = [_letter_set(word) for word in words]
+        alphabet = {char: bit for bit, char in enumerate(sorted(frozenset().union(*letter_sets)))}
+        return SimpleNamespace(
+            words=tuple(words),
+            matrix=matrix,
+            lengths=np.fromiter(map(len, words), dtype=np.int32, count=len(words)),
+            alphabet=alphabet,
+            letters=np.fromiter(map(len, letter_sets), dtype=np.int32, count=len(words)),
+            masks=_letter_masks(letter_sets, alphabet),
+        )
 
 
     def _get_default_words(self):
@@ -156,50 +413,22 @@ class PasswordGenerator:
         ]
 
 
-    def _simple_vector(self, word):
-        """Создает простое векторное представление слова.
-
-        Представляет слово в виде вектора длиной 26, содержащего
-        нормализованные частоты букв латинского алфавита.
-
-        Args:
-            word: Исходное слово, для которого строится вектор.
-
-        Returns:
-            list[float]: Нормализованный вектор длиной 26.
-        """
-        vector = [0] * 26
-        word = word.lower()
-        
-        for char in word:
-            if 'a' <= char <= 'z':
-                char_index = ord(char) - ord('a')
-                vector[char_index] += 1
-        
-        # Нормализуем вектор
-        length = math.sqrt(sum(x * x for x in vector))
-        if length > 0:
-            vector = [x/length for x in vector]
-        
-        return vector
-    
-
     def _cosine_similarity(self, vec1, vec2):
         """Вычисляет косинусное сходство двух векторов.
 
+        Векторы должны быть заранее нормализованы, поэтому сходство
+        равно их скалярному произведению.
+
         Args:
-            vec1: Первый вектор чисел одинаковой длины.
-            vec2: Второй вектор чисел одинаковой длины.
+            vec1: Первый нормализованный вектор numpy.
+            vec2: Второй нормализованный вектор numpy той же формы.
 
         Returns:
             float: Значение косинусного сходства от 0 до 1.
-                При несоответствии размеров возвращает 0.
         """
-        if len(vec1) != len(vec2): # Защита от ошибок; векторы должны быть длины 1
-            return 0
+        assert vec1.shape == vec2.shape
         
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        return dot_product
+        return float(vec1 @ vec2)
     
 
     def _semantic_distance(self, word1, word2):
@@ -216,8 +445,8 @@ class PasswordGenerator:
             float: Итоговая оценка близости в диапазоне от 0 до 1,
             где большие значения означают большую похожесть.
         """
-        vec1 = self._simple_vector(word1)
-        vec2 = self._simple_vector(word2)
+        vec1 = _simple_vector(word1)
+        vec2 = _simple_vector(word2)
         
         # Косинусная близость
         similarity = self._cosine_similarity(vec1, vec2)
@@ -226,9 +455,11 @@ class PasswordGenerator:
         # 1. Длина слов (чем ближе длина, тем лучше)
         length_factor = 1 - abs(len(word1) - len(word2)) / max(len(word1), len(word2), 1)
         
-        # 2. Общие буквы
-        common_letters = len(set(word1) & set(word2))
-        max_letters = max(len(set(word1)), len(set(word2)), 1)
+        # 2. Общие буквы (множества букв кешируются для каждого слова)
+        letters1 = _letter_set(word1)
+        letters2 = _letter_set(word2)
+        common_letters = len(letters1 & letters2)
+        max_letters = max(len(letters1), len(letters2), 1)
         common_factor = common_letters / max_letters
         
         # Итоговая оценка
@@ -261,36 +492,48 @@ class PasswordGenerator:
                 * фактически использованной темы,
                 * списка выбранных слов.
         """
-        if not hasattr(self, 'word_list'):
-            self.word_list = self._get_default_words()
+        if self._index is None:
+            self._set_word_list(self._get_default_words())
         
         if theme_word is None:
             theme_word = secrets.choice(self.word_list)
         
-        # Фильтруем слова по длине (исключаем слишком короткие/длинные)
-        filtered_words = [word for word in self.word_list if 3 <= len(word) <= 8]
+        index = self._index
+        
+        # Косинусная близость всех слов к теме одним умножением матрицы на вектор
+        theme_vec = _simple_vector(theme_word)
+        similarity = index.matrix @ theme_vec
         
-        if not filtered_words:
-            filtered_words = self.word_list
+        # Длина и общие буквы вместе добавляют к оценке от 0 до 0.5, поэтому
+        # слова, которые не попадут в окно при любых их значениях, отсекаем
+        # по одному косинусу и полную оценку считаем только для остальных
+        half = similarity * 0.5
+        candidate_idx = np.flatnonzero((half + 0.5 >= min_similarity) & (half <= max_similarity))
+        theme_letters = _letter_set(theme_word)
+        scores = _score_candidates(
+            similarity[candidate_idx], len(theme_word), len(theme_letters),
+            _letter_masks((theme_letters,), index.alphabet)[0],
+            index.lengths[candidate_idx], index.letters[candidate_idx], index.masks[candidate_idx]
+        )
         
         # Выбираем слова, связанные с темой
-        related_words = []
-        for word in filtered_words:
-            if word.lower() == theme_word.lower():
-                continue
-            
-            similarity = self._semantic_distance(theme_word, word)
-            if min_similarity <= similarity <= max_similarity:
-                related_words.append((word, similarity))
+        in_range = (scores >= min_similarity) & (scores <= max_similarity)
+        related_idx = candidate_idx[in_range]
+        scores = scores[in_range]
         
-        # Сортируем по близости и берем нужное количество
-        related_words.sort(key=lambda x: x[1], reverse=True)
+        # Обычно хватает нескольких самых близких слов, поэтому вместо полной
+        # сортировки сначала берем top-k; остальные слова из окна
+        # перебираются, только если среди top-k не нашлось достаточно разных
         selected_words = [theme_word]
         
-        for word, similarity in related_words:
+        for i in _ranked_order(scores, password_length * 4):
             if len(selected_words) >= password_length:
                 break
             
+            word = index.words[related_idx[i]]
+            if word.lower() == theme_word.lower():
+                continue
+            
             # Проверяем, чтобы новое слово не было слишком похоже на уже выбранные
             too_similar = False
             for existing_word in selected_words:
@@ -303,33 +546,34 @@ class PasswordGenerator:
         
         # Если не набрали достаточно слов, добавляем случайные
         while len(selected_words) < password_length:
-            random_word = secrets.choice(filtered_words)
+            random_word = secrets.choice(index.words)
             if random_word not in selected_words:
                 selected_words.append(random_word)
         
         # Создаем пароль с разделителями и преобразованиями
+        # На каждое слово берем один случайный байт: бит 0 - регистр,
+        # бит 1 - замена букв на цифры, биты 2-7 - маска отдельных замен
         password_parts = []
-        for word in selected_words:
-            if secrets.choice([True, False]):  # 50% шанс изменения регистра
+        for word, flags in zip(selected_words, secrets.token_bytes(len(selected_words))):
+            if flags & 0b01:  # 50% шанс изменения регистра
                 word = word.capitalize()
             
-            if secrets.choice([True, False]):  # 50% шанс заменить буквы на цифры
-                replacements = {'a': '4', 'e': '3', 'i': '1', 'o': '0', 's': '5', 't': '7'}
-                for old, new in replacements.items():
-                    if secrets.choice([True, False]):
-                        word = word.replace(old, new).replace(old.upper(), new)
+            if flags & 0b10:  # 50% шанс заменить буквы на цифры
+                # Каждая замена включается с вероятностью 50% (свой бит маски)
+                word = word.translate(_LEET_TABLES[flags >> 2])
             
             password_parts.append(word)
         
         # Выбираем случайный разделитель
-        separators = ['-', '_', '.', '', '+', '=']
-        separator = secrets.choice(separators)
+        separator = secrets.choice(self._SEPARATORS)
         
         password = separator.join(password_parts)
         
-        # Добавляем цифру в конце с вероятностью 80%
-        if secrets.choice([True, True, True, True, False]):
-            password += str(secrets.randbelow(10))
+        # Добавляем цифру в конце с вероятностью 80%: значения 0-39 из 50
+        # дают цифру (каждую равновероятно), 40-49 - пропуск
+        tail = secrets.randbelow(50)
+        if tail < 40:
+            password += str(tail % 10)
         
         if self.logs:
             self._log(f'Generated semantic password based on theme: "{theme_word}"', 'generator')
@@ -1,73 +1,236 @@
 import sqlite3
 import os
+import atexit
 import datetime
 import hashlib
+import hmac
+import json
 from Crypto.Cipher import AES
-from Crypto.Random import get_random_bytes
+from Crypto.Hash import SHA256
 from Crypto.Protocol.KDF import PBKDF2
 import base64
 import getpass
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+try:
+    from argon2.low_level import hash_secret_raw, Type
+except ImportError:  # argon2-cffi не установлен, остается только PBKDF2
+    hash_secret_raw = None
+
+# Параметры KDF для новых хранилищ: Argon2id, а без argon2-cffi - PBKDF2-HMAC-SHA256
+ARGON2_PARAMS = {'kdf': 'argon2id', 'time_cost': 3, 'memory_cost': 65536, 'parallelism': 2}
+PBKDF2_PARAMS = {'kdf': 'pbkdf2-sha256', 'count': 600000}
+DEFAULT_KDF_PARAMS = ARGON2_PARAMS if hash_secret_raw else PBKDF2_PARAMS
+# Параметры, которыми получены ключи хранилищ без сохраненного файла параметров
+LEGACY_KDF_PARAMS = {'kdf': 'pbkdf2-sha1', 'count': 100000}
+
+
+def _derive_key(password: str, salt: bytes, params: dict) -> bytes:
+    """Получает 256-битный ключ шифрования из пароля.
+
+    Args:
+        password: Текстовый мастер-пароль.
+        salt: Соль для KDF.
+        params: Словарь с именем KDF (ключ ``kdf``) и его параметрами,
+            например ARGON2_PARAMS.
+
+    Returns:
+        bytes: Ключ длиной 32 байта.
+
+    Raises:
+        RuntimeError: Если для Argon2id не установлен пакет argon2-cffi.
+        ValueError: Если указан неизвестный KDF.
+    """
+    kdf = params['kdf']
+    if kdf == 'argon2id':
+        if hash_secret_raw is None:
+            raise RuntimeError("Для этого хранилища нужен пакет argon2-cffi")
+        return hash_secret_raw(password.encode(), salt,
+                               time_cost=params['time_cost'],
+                               memory_cost=params['memory_cost'],
+                               parallelism=params['parallelism'],
+                               hash_len=32, type=Type.ID)
+    if kdf == 'pbkdf2-sha256':
+        return PBKDF2(password.encode(), salt, dkLen=32, count=params['count'],
+                      hmac_hash_module=SHA256)
+    if kdf == 'pbkdf2-sha1':
+        return PBKDF2(password.encode(), salt, dkLen=32, count=params['count'])
+    raise ValueError(f"Неизвестный KDF: {kdf}")
+
+
+def _key_verifier(key: bytes) -> bytes:
+    """Вычисляет проверочное значение ключа хранилища.
+
+    По нему проверяется мастер-пароль. Получить значение из пароля можно
+    только через KDF с солью хранилища, поэтому перебор паролей по нему
+    не дешевле подбора ключа, а сам ключ из него не восстанавливается.
+
+    Args:
+        key: Ключ шифрования хранилища.
+
+    Returns:
+        bytes: HMAC-SHA256 фиксированной строки на этом ключе.
+    """
+    return hmac.new(key, b'AeonVault master key check', hashlib.sha256).digest()
+
+
+# Таблица паролей; {table} - имя таблицы (другое имя нужно при миграции)
+_SQL_CREATE_PASSWORDS = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        service TEXT PRIMARY KEY,
+        credentials BLOB NOT NULL
+    ) WITHOUT ROWID
+'''
+
+# Запросы, выполняемые на каждое действие пользователя
+_SQL_SAVE_PASSWORD = "INSERT OR REPLACE INTO passwords (service, credentials) VALUES (?, ?)"
+_SQL_GET_PASSWORD = "SELECT credentials FROM passwords WHERE service = ?"
+_SQL_LIST_SERVICES = "SELECT service FROM passwords ORDER BY service"
+_SQL_DELETE_PASSWORD = "DELETE FROM passwords WHERE service = ?"
+_SQL_INSERT_LOG = "INSERT INTO logs (timestamp, action, service) VALUES (?, ?, ?)"
+
+
+def _pack_credentials(login: str, password: str) -> bytes:
+    """Собирает логин и пароль в один блок для шифрования.
+
+    Блок начинается с длины логина в байтах (4 байта, big-endian),
+    за ней идут логин и пароль в UTF-8.
+
+    Args:
+        login: Логин пользователя в открытом виде.
+        password: Пароль пользователя в открытом виде.
+
+    Returns:
+        bytes: Блок для шифрования.
+    """
+    login_bytes = login.encode()
+    return len(login_bytes).to_bytes(4, 'big') + login_bytes + password.encode()
+
+
+def _unpack_credentials(data: bytes) -> tuple:
+    """Разбирает блок, собранный функцией _pack_credentials.
+
+    Args:
+        data: Расшифрованный блок.
+
+    Returns:
+        tuple[str, str]: Кортеж (login, password).
+    """
+    end = 4 + int.from_bytes(data[:4], 'big')
+    return data[4:end].decode(), data[end:].decode()
+
+
+def _connect(db_file: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Открывает SQLite-БД с настройками для частых мелких записей.
+
+    Журнал WAL с synchronous=NORMAL требует меньше fsync на каждую
+    фиксацию транзакции и при этом сохраняет целостность БД при сбоях.
+
+    Args:
+        db_file: Путь к файлу SQLite-БД.
+        check_same_thread: Передается в sqlite3.connect; False разрешает
+            пользоваться соединением из других потоков.
+
+    Returns:
+        sqlite3.Connection: Открытое соединение.
+    """
+    conn = sqlite3.connect(db_file, cached_statements=256,
+                           check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
 
 class AESEncryptor:
-    """Шифрует и расшифровывает строки с помощью AES-GCM.
+    """Шифрует и расшифровывает данные с помощью AES-GCM.
 
-    Использует PBKDF2 для получения ключа из текстового пароля
-    и хранит соль вместе с объектом.
+    Использует Argon2id (или PBKDF2, если argon2-cffi недоступен) для
+    получения ключа из текстового пароля и хранит соль и параметры KDF
+    вместе с объектом.
     """
-    def __init__(self, password: str, salt: bytes = None):
+    # Первый байт записей текущего формата (nonce 12 байт, шифр cryptography)
+    FORMAT_VERSION = b'\x01'
+
+    def __init__(self, password: str, salt: bytes = None, kdf_params: dict = None):
         """Создает шифратор AES на основе пароля.
 
         Args:
             password: Текстовый мастер-пароль, из которого будет
                 получен ключ шифрования.
-            salt: Соль для PBKDF2. Если не указана, генерируется
+            salt: Соль для KDF. Если не указана, генерируется
                 случайная соль длиной 16 байт.
+            kdf_params: Параметры KDF (см. _derive_key). Если не указаны,
+                используется Argon2id, а без argon2-cffi - PBKDF2-HMAC-SHA256.
 
         """
-        self.salt = salt if salt else get_random_bytes(16)
+        self.salt = salt if salt else os.urandom(16)
+        if kdf_params is None:
+            kdf_params = DEFAULT_KDF_PARAMS
+        self.kdf_params = kdf_params
         # Генерируем ключ 256 бит из пароля
-        self.key = PBKDF2(password.encode(), self.salt, dkLen=32, count=100000)
+        self.key = _derive_key(password, self.salt, kdf_params)
+        # Расписание ключей AES готовится один раз и переиспользуется в каждом вызове
+        self._aead = AESGCM(self.key)
     
-    def encrypt(self, text: str) -> str:
-        """Шифрует текст с использованием AES-GCM.
-
-        Данные шифруются с генерацией случайного nonce, а затем
-        объединяются в одну строку, кодируемую в base64.
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """Шифрует байты с использованием AES-GCM.
 
         Args:
-            text: Исходная строка в открытом виде.
+            data: Исходные данные в открытом виде.
 
         Returns:
-            str: Строка в кодировке base64, содержащая nonce, тег
-            аутентичности и зашифрованный текст.
+            bytes: Байт версии формата, случайный nonce и зашифрованные
+            данные с тегом аутентичности в конце.
         """
-        cipher = AES.new(self.key, AES.MODE_GCM)
-        ciphertext, tag = cipher.encrypt_and_digest(text.encode())
-        # Объединяем nonce + tag + ciphertext в одну строку
-        encrypted = cipher.nonce + tag + ciphertext
-        return base64.b64encode(encrypted).decode()
+        nonce = os.urandom(12)
+        return self.FORMAT_VERSION + nonce + self._aead.encrypt(nonce, data, None)
     
-    def decrypt(self, encrypted_text: str) -> str:
-        """Расшифровывает текст, зашифрованный методом encrypt.
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        """Расшифровывает байты, зашифрованные методом encrypt_bytes.
 
-        Ожидает строку base64, содержащую nonce, тег и шифртекст.
-        При повреждении данных или неверном ключе вызывается исключение.
+        Записи старого формата без байта версии этим методом не читаются:
+        они встречаются только в таблицах, которые переводит в текущий
+        формат PasswordStorage._migrate_split_columns.
+
+        Args:
+            data: Зашифрованные данные.
+
+        Returns:
+            bytes: Расшифрованные данные.
+
+        Raises:
+            ValueError: Если данные повреждены, имеют неизвестный формат
+                или аутентификация шифртекста не проходит.
+        """
+        if data[:1] != self.FORMAT_VERSION:
+            raise ValueError("Неизвестный формат записи")
+        try:
+            return self._aead.decrypt(data[1:13], data[13:], None)
+        except InvalidTag:
+            raise ValueError("Данные повреждены или ключ неверен") from None
+    
+    def _decrypt_legacy(self, data: bytes) -> bytes:
+        """Расшифровывает запись в старом формате (nonce 16 байт, тег, шифртекст).
 
         Args:
-            encrypted_text: Строка base64, полученная методом encrypt.
+            data: Байты записи.
 
         Returns:
-            str: Расшифрованная строка в открытом виде.
+            bytes: Расшифрованные данные.
 
         Raises:
             ValueError: Если данные повреждены или аутентификация
                 шифртекста не проходит.
-            binascii.Error: Если строка не является корректной base64.
         """
-        data = base64.b64decode(encrypted_text.encode())
         nonce, tag, ciphertext = data[:16], data[16:32], data[32:]
-        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce)
-        return cipher.decrypt_and_verify(ciphertext, tag).decode()
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce, use_aesni=True)
+        return cipher.decrypt_and_verify(ciphertext, tag)
 
 class PasswordStorage:
     """Хранилище паролей с шифрованием и мастер-паролем.
@@ -75,6 +238,9 @@ class PasswordStorage:
     Пароли и логины сохраняются в SQLite-базе в зашифрованном виде,
     доступ к расшифровке контролируется мастер-паролем.
     """
+    # Сколько расшифрованных записей держать в памяти для повторных get()
+    CACHE_SIZE = 128
+
     def __init__(self, db_file='passwords.db'):
         """Создает или открывает хранилище паролей.
 
@@ -95,21 +261,34 @@ class PasswordStorage:
         """
         self.db_file = db_file
         self.salt_file = 'vault_salt.bin'
+        self.kdf_file = 'vault_kdf.json'
+        self.verifier_file = 'vault_verifier.bin'
+        # Несоленый SHA-256 мастер-пароля; есть только у хранилищ старых версий
         self.hash_file = 'master_hash.txt'
         self.conn = None
         self.cursor = None
         self.crypto = None
+        # Мастер-пароль хранилища старого формата; нужен только для перевода
+        # его на текущий KDF в _migrate_split_columns и сразу сбрасывается
+        self._legacy_password = None
+        # Расшифрованные записи (service -> (login, password)) в порядке обращения
+        self._cache = OrderedDict()
         self._setup_crypto()
-        self.conn = sqlite3.connect(db_file)
+        self.conn = _connect(db_file)
         self.cursor = self.conn.cursor()
         self._init_db()
     
     def _setup_crypto(self):
         """Настраивает объект шифрования и мастер-пароль.
 
-        Если хранилище уже существует, запрашивает мастер-пароль
-        и проверяет его по сохраненному хешу. Если нет — создает
-        новый мастер-пароль, соль и файл с хешем.
+        Если хранилище уже существует (есть файл соли), запрашивает
+        мастер-пароль и проверяет его по проверочному значению ключа
+        (у хранилищ без файла параметров KDF - по сохраненному хешу).
+        Если нет — создает новый мастер-пароль, файл параметров KDF,
+        проверочное значение и соль.
+
+        Returns:
+            None.
 
         Raises:
             ValueError: При неверном вводе мастер-пароля или его
@@ -117,20 +296,48 @@ class PasswordStorage:
             FileNotFoundError: Если файл с хешем не найден
                 для существующего хранилища.
         """
-        if os.path.exists(self.db_file) and os.path.exists(self.salt_file):
-            # Загружаем существующее
+        # Хранилище считается существующим, если есть файл соли: открываем его
+        # сразу, без отдельной проверки существования
+        try:
             with open(self.salt_file, 'rb') as f:
                 salt = f.read()
+        except FileNotFoundError:
+            salt = None
+        
+        if salt is not None:
+            # Загружаем существующее
+            try:
+                with open(self.kdf_file, 'r') as f:
+                    kdf_params = json.load(f)
+            except FileNotFoundError:
+                # Хранилища, созданные до перехода на Argon2id, не имеют файла параметров
+                kdf_params = LEGACY_KDF_PARAMS
+            
+            if kdf_params is LEGACY_KDF_PARAMS:
+                # Сначала дешево проверяем пароль по хешу, а медленный KDF
+                # запускаем один раз, когда пароль уже известен как верный
+                while True:
+                    password = getpass.getpass("Введите мастер-пароль: ")
+                    try:
+                        self._test_password(password)
+                        break
+                    except ValueError:
+                        print("Неверный пароль")
+                
+                self._legacy_password = password
+                self.crypto = AESEncryptor(password, salt, kdf_params)
+                return
+            
+            with open(self.verifier_file, 'rb') as f:
+                verifier = f.read()
             
             while True:
                 password = getpass.getpass("Введите мастер-пароль: ")
-                try:
-                    self.crypto = AESEncryptor(password, salt)
-                    # Проверяем пароль
-                    self._test_password(password)
-                    break
-                except ValueError:
-                    print("Неверный пароль")
+                crypto = AESEncryptor(password, salt, kdf_params)
+                if hmac.compare_digest(_key_verifier(crypto.key), verifier):
+                    self.crypto = crypto
+                    return
+                print("Неверный пароль")
         else:
             # Создаем новое
             password = getpass.getpass("Создайте мастер-пароль: ")
@@ -139,18 +346,28 @@ class PasswordStorage:
             if password != password2:
                 raise ValueError("Пароли не совпадают")
             
-            self.crypto = AESEncryptor(password)
-
-            with open(self.salt_file, 'wb') as f:
-                f.write(self.crypto.salt)
+            salt = os.urandom(16)
+            kdf_params = DEFAULT_KDF_PARAMS
+            self.crypto = AESEncryptor(password, salt, kdf_params)
+            
+            with open(self.kdf_file, 'w') as f:
+                json.dump(kdf_params, f)
+            
+            # Вместо хеша пароля храним значение, которое без KDF не проверить
+            with open(self.verifier_file, 'wb') as f:
+                f.write(_key_verifier(self.crypto.key))
             
-            with open(self.hash_file, 'w') as f:
-                f.write(hashlib.sha256(password.encode()).hexdigest())
+            # Соль записывается последней: по ней хранилище считается созданным
+            with open(self.salt_file, 'wb') as f:
+                f.write(salt)
             print("Хранилище создано")
     
     def _test_password(self, password_to_test: str):
         """Проверяет мастер-пароль по сохраненному хешу.
 
+        Hex-хеш из файла переводится в байты и сравнивается с хешем
+        введенного пароля за постоянное время.
+
         Args:
             password_to_test: Пароль, введенный пользователем
                 для проверки доступа.
@@ -159,59 +376,169 @@ class PasswordStorage:
             ValueError: Если хеш пароля не совпадает с сохраненным.
             FileNotFoundError: Если файл с хешом не найден.
         """
-        if os.path.exists(self.hash_file):
-            with open(self.hash_file, 'r') as f:
-                saved_hash = f.read().strip()
-            
-            password_to_test_hash = hashlib.sha256(password_to_test.encode()).hexdigest()
-            
-            if password_to_test_hash != saved_hash:
-                raise ValueError("Неверный пароль")
-        else:
-            raise FileNotFoundError(f"Файл {self.hash_file} не найден")
+        # Если файла нет, FileNotFoundError уходит выше
+        with open(self.hash_file, 'r') as f:
+            saved_hash = bytes.fromhex(f.read().strip())
+        
+        password_to_test_hash = hashlib.sha256(password_to_test.encode()).digest()
+        
+        if not hmac.compare_digest(password_to_test_hash, saved_hash):
+            raise ValueError("Неверный пароль")
 
     def _init_db(self):
         """Создает таблицу паролей в БД при необходимости.
 
-        Таблица содержит сервис (первичный ключ), логин и пароль,
-        при этом логин и пароль хранятся в зашифрованном виде.
+        Таблица содержит сервис (первичный ключ) и зашифрованный BLOB
+        с логином и паролем: оба значения шифруются одним блоком, поэтому
+        чтение записи требует одной расшифровки вместо двух.
+        Таблица объявлена WITHOUT ROWID: записи лежат прямо в B-дереве
+        первичного ключа, и list_all читает их по порядку без обращения
+        к отдельной таблице. Таблицы и записи старого формата переводятся
+        в текущий.
 
         Returns:
             None.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS passwords (
-                service TEXT PRIMARY KEY,
-                login TEXT NOT NULL,
-                password TEXT NOT NULL
-            )
-        ''')
+        self.cursor.execute(_SQL_CREATE_PASSWORDS.format(table='passwords'))
         self.conn.commit()
+        self._migrate_split_columns()
     
-    def save(self, service: str, login: str, password: str):
+    def _migrate_split_columns(self):
+        """Переводит хранилище старого формата в текущий.
+
+        Раньше логин и пароль шифровались по отдельности и лежали
+        в столбцах login и password (в самых старых хранилищах - как
+        base64-строки в таблице с rowid). Записи расшифровываются,
+        шифруются заново одним блоком, и таблица пересоздается
+        в одной транзакции, поэтому при сбое остается прежняя таблица.
+
+        Хранилища без файла параметров KDF заодно переводятся на текущий
+        KDF: ключ выводится заново с новой солью, записи шифруются этим
+        ключом, затем записываются файл параметров и проверочное значение,
+        удаляется хеш мастер-пароля, и последней заменяется соль.
+
+        Returns:
+            None.
+        """
+        password, self._legacy_password = self._legacy_password, None
+        self.cursor.execute("PRAGMA table_info(passwords)")
+        split_columns = 'login' in {column[1] for column in self.cursor}
+        if not split_columns and password is None:
+            return
+        
+        crypto = self.crypto
+        if password is not None:
+            crypto = AESEncryptor(password, os.urandom(16), DEFAULT_KDF_PARAMS)
+        
+        rows = []
+        if split_columns:
+            self.cursor.execute("SELECT service, login, password FROM passwords")
+            for service, enc_login, enc_password in self.cursor.fetchall():
+                # Самые старые записи хранились как base64-текст
+                if isinstance(enc_login, str):
+                    enc_login = base64.b64decode(enc_login)
+                    enc_password = base64.b64decode(enc_password)
+                credentials = _pack_credentials(self._decrypt_split_value(enc_login).decode(),
+                                                self._decrypt_split_value(enc_password).decode())
+                rows.append((service, crypto.encrypt_bytes(credentials)))
+        else:
+            self.cursor.execute("SELECT service, credentials FROM passwords")
+            for service, enc_credentials in self.cursor.fetchall():
+                credentials = self.crypto.decrypt_bytes(enc_credentials)
+                rows.append((service, crypto.encrypt_bytes(credentials)))
+        
+        with self.conn:
+            self.cursor.execute("BEGIN")
+            self.cursor.execute(_SQL_CREATE_PASSWORDS.format(table='passwords_new'))
+            self.cursor.executemany(
+                "INSERT INTO passwords_new (service, credentials) VALUES (?, ?)", rows
+            )
+            self.cursor.execute("DROP TABLE passwords")
+            self.cursor.execute("ALTER TABLE passwords_new RENAME TO passwords")
+        
+        if crypto is self.crypto:
+            return
+        
+        with open(self.kdf_file, 'w') as f:
+            json.dump(crypto.kdf_params, f)
+        with open(self.verifier_file, 'wb') as f:
+            f.write(_key_verifier(crypto.key))
+        os.remove(self.hash_file)
+        # Соль заменяется атомарно и последней, как и при создании хранилища
+        with open(self.salt_file + '.new', 'wb') as f:
+            f.write(crypto.salt)
+        os.replace(self.salt_file + '.new', self.salt_file)
+        self.crypto = crypto
+    
+    def _decrypt_split_value(self, data: bytes) -> bytes:
+        """Расшифровывает значение из таблицы старого формата.
+
+        Такие значения бывают как в текущем формате, так и в формате
+        без байта версии (nonce 16 байт, тег, шифртекст).
+
+        Args:
+            data: Байты значения из столбца login или password.
+
+        Returns:
+            bytes: Расшифрованные данные.
+
+        Raises:
+            ValueError: Если значение не расшифровывается ни в одном формате.
+        """
+        try:
+            return self.crypto.decrypt_bytes(data)
+        except ValueError:
+            # Старая запись (в том числе случайно начинающаяся с байта версии)
+            return self.crypto._decrypt_legacy(data)
+    
+    def save(self, service: str, login: str, password: str, commit: bool = True):
         """Сохраняет или обновляет зашифрованный пароль в хранилище.
 
         Args:
             service: Название сервиса, выступает в роли ключа.
             login: Логин пользователя в открытом виде.
             password: Пароль пользователя в открытом виде.
+            commit: Если False, транзакция не фиксируется, чтобы
+                вызывающий код мог зафиксировать несколько записей разом.
 
         Returns:
             None.
         """
-        enc_login = self.crypto.encrypt(login)
-        enc_password = self.crypto.encrypt(password)
+        credentials = self.crypto.encrypt_bytes(_pack_credentials(login, password))
         
-        self.cursor.execute('''
-            INSERT OR REPLACE INTO passwords (service, login, password)
-            VALUES (?, ?, ?)
-        ''', (service, enc_login, enc_password))
-        self.conn.commit()
+        self.cursor.execute(_SQL_SAVE_PASSWORD, (service, credentials))
+        self._cache.pop(service, None)
+        if commit:
+            self.conn.commit()
         print(f"Пароль для {service} сохранен")
     
+    def save_many(self, records: Iterable[tuple[str, str, str]]):
+        """Сохраняет или обновляет несколько паролей в одной транзакции.
+
+        Args:
+            records: Итерируемый набор кортежей (service, login, password)
+                с данными в открытом виде.
+
+        Returns:
+            None.
+        """
+        enc_records = [
+            (service, self.crypto.encrypt_bytes(_pack_credentials(login, password)))
+            for service, login, password in records
+        ]
+        
+        with self.conn:
+            self.cursor.executemany(_SQL_SAVE_PASSWORD, enc_records)
+        for service, _ in enc_records:
+            self._cache.pop(service, None)
+        print(f"Сохранено паролей: {len(enc_records)}")
+    
     def get(self, service: str) -> tuple:
         """Возвращает расшифрованные логин и пароль для сервиса.
 
+        Последние CACHE_SIZE прочитанных записей хранятся расшифрованными,
+        поэтому повторный запрос того же сервиса не обращается к БД.
+
         Args:
             service: Название сервиса, для которого нужно получить данные.
 
@@ -219,15 +546,20 @@ class PasswordStorage:
             tuple[str, str] | None: Кортеж (login, password), если запись найдена,
             или None, если сервис отсутствует в хранилище.
         """
-        self.cursor.execute(
-            "SELECT login, password FROM passwords WHERE service = ?", 
-            (service,)
-        )
+        cached = self._cache.get(service)
+        if cached:
+            self._cache.move_to_end(service)
+            return cached
+        
+        self.cursor.execute(_SQL_GET_PASSWORD, (service,))
         row = self.cursor.fetchone()
         
         if row:
-            login = self.crypto.decrypt(row[0])
-            password = self.crypto.decrypt(row[1])
+            (enc_credentials,) = row
+            login, password = _unpack_credentials(self.crypto.decrypt_bytes(enc_credentials))
+            self._cache[service] = (login, password)
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
             return login, password
         return None
     
@@ -237,8 +569,8 @@ class PasswordStorage:
         Returns:
             list[str]: Список названий сервисов, отсортированный по алфавиту.
         """
-        self.cursor.execute("SELECT service FROM passwords ORDER BY service")
-        return [row[0] for row in self.cursor.fetchall()]
+        self.cursor.execute(_SQL_LIST_SERVICES)
+        return [service for (service,) in self.cursor]
     
     def delete(self, service: str):
         """Удаляет запись о сервисе из хранилища.
@@ -250,33 +582,53 @@ class PasswordStorage:
         Returns:
             None.
         """
-        self.cursor.execute("DELETE FROM passwords WHERE service = ?", (service,))
+        self.cursor.execute(_SQL_DELETE_PASSWORD, (service,))
+        self._cache.pop(service, None)
         self.conn.commit()
         print(f"Пароль для {service} удален")
     
     def close(self):
         """Закрывает соединение с базой данных.
 
+        Заодно очищает кеш расшифрованных записей, чтобы открытые
+        пароли не оставались в памяти объекта.
+
         Returns:
             None.
         """
+        self._cache.clear()
         self.conn.close()
 
 class LogStorage:
     """Простое хранилище логов действий пользователя.
 
     Записывает события в SQLite-таблицу с временем, типом действия
-    и связанным сервисом.
+    и связанным сервисом. Записи копятся в памяти и сбрасываются в БД
+    фоновым потоком одной транзакцией раз в FLUSH_INTERVAL секунд,
+    поэтому log() не ждет записи на диск. Если сброс не удался, записи
+    остаются в буфере до следующей попытки. Остаток буфера записывается
+    в close(), который также вызывается при завершении интерпретатора.
+
+    Фоновый поток и обработчик atexit держат ссылки на объект, поэтому
+    он живет до вызова close() или до завершения интерпретатора; объект,
+    который больше не нужен, следует закрывать явно.
     """
+    # Период сброса накопленных записей в БД, секунды
+    FLUSH_INTERVAL = 0.1
+
     def __init__(self, log_file='logs.db'):
-        """Создает или открывает БД логов.
+        """Создает или открывает БД логов и запускает фоновый сброс записей.
 
         Args:
             log_file: Путь к файлу SQLite-БД, в котором будут
                 храниться записи логов.
 
         """
-        self.conn = sqlite3.connect(log_file)
+        # Соединением пользуются фоновый поток и close(), доступ к нему
+        # упорядочен блокировкой _flush_lock
+        self.conn = _connect(log_file, check_same_thread=False)
+        # Функция текущего времени, привязанная заранее для горячего пути log()
+        self._now = datetime.datetime.now
         self.cursor = self.conn.cursor()
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS logs (
@@ -286,9 +638,22 @@ class LogStorage:
             )
         ''')
         self.conn.commit()
+        
+        self._buffer = deque()
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        # Записи не теряются, даже если программа завершится без вызова close();
+        # ссылка из atexit держит объект до close()
+        self._closed = False
+        atexit.register(self.close)
     
     def log(self, action: str, service: str = ""):
-        """Записывает новую строку в таблицу логов.
+        """Добавляет новую строку в буфер логов.
+
+        Строка попадет в БД при ближайшем фоновом сбросе или при close().
 
         Args:
             action: Краткое описание действия (например, 'save_password').
@@ -297,17 +662,107 @@ class LogStorage:
 
         Returns:
             None.
+
+        Raises:
+            sqlite3.ProgrammingError: Если хранилище логов уже закрыто.
         """
-        self.cursor.execute(
-            "INSERT INTO logs (timestamp, action, service) VALUES (?, ?, ?)",
-            (datetime.datetime.now().isoformat(), action, service)
-        )
-        self.conn.commit()
+        entry = (self._now().isoformat(), action, service)
+        with self._buffer_lock:
+            self._check_open()
+            self._buffer.append(entry)
+    
+    def log_many(self, entries: Iterable[tuple[str, str]]):
+        """Добавляет несколько строк в буфер логов.
+
+        Args:
+            entries: Итерируемый набор кортежей (action, service).
+
+        Returns:
+            None.
+
+        Raises:
+            sqlite3.ProgrammingError: Если хранилище логов уже закрыто.
+        """
+        timestamp = self._now().isoformat()
+        rows = [(timestamp, action, service) for action, service in entries]
+        with self._buffer_lock:
+            self._check_open()
+            self._buffer.extend(rows)
+    
+    def _check_open(self):
+        """Проверяет, что close() еще не вызывался.
+
+        Вызывается под _buffer_lock, чтобы запись не попала в буфер
+        после его последнего сброса.
+
+        Returns:
+            None.
+
+        Raises:
+            sqlite3.ProgrammingError: Если хранилище логов уже закрыто.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Хранилище логов закрыто")
+    
+    def _flush(self):
+        """Записывает все накопленные строки в БД одной транзакцией.
+
+        Если запись не удалась, строки возвращаются в начало буфера,
+        чтобы попасть в БД при следующем сбросе.
+
+        Returns:
+            None.
+
+        Raises:
+            sqlite3.Error: Если записать строки в БД не удалось.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, deque()
+            if not rows:
+                return
+            try:
+                with self.conn:
+                    self.conn.executemany(_SQL_INSERT_LOG, rows)
+            except sqlite3.Error:
+                with self._buffer_lock:
+                    self._buffer.extendleft(reversed(rows))
+                raise
+    
+    def _flush_periodically(self):
+        """Цикл фонового потока: сбрасывает буфер, пока не вызван close().
+
+        Returns:
+            None.
+        """
+        while not self._stop.wait(self.FLUSH_INTERVAL):
+            try:
+                self._flush()
+            except sqlite3.Error:
+                # Например, БД заблокирована другим экземпляром приложения:
+                # строки остались в буфере, повторим при следующем сбросе
+                pass
     
     def close(self):
-        """Закрывает соединение с БД логов.
+        """Останавливает фоновый сброс, записывает остаток буфера
+        и закрывает соединение с БД логов.
+
+        Повторный вызов ничего не делает.
 
         Returns:
             None.
+
+        Raises:
+            sqlite3.Error: Если записать остаток буфера в БД не удалось.
         """
-        self.conn.close()
\ No newline at end of file
+        with self._buffer_lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        self._stop.set()
+        self._flusher.join()
+        try:
+            self._flush()
+        finally:
+            self.conn.close()
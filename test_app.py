@@ -1,9 +1,20 @@
 # test_app.py
+import base64
+import getpass
+import hashlib
+import itertools
+import json
 import os
 import sqlite3
 import tempfile
-from generator import PasswordGenerator
-from storage import AESEncryptor, PasswordStorage, LogStorage
+import time
+from collections import OrderedDict
+import numpy as np
+from Crypto.Cipher import AES
+from Crypto.Protocol.KDF import PBKDF2
+from generator import (PasswordGenerator, _letter_masks, _letter_set, _random_chars,
+                       _score_candidates, _simple_vector)
+from storage import AESEncryptor, PasswordStorage, LogStorage, DEFAULT_KDF_PARAMS
 
 
 class DummyLogger:
@@ -14,28 +25,62 @@ class DummyLogger:
         self.records.append((action, service))
 
 
+def make_storage(db_path):
+    # Хранилище поверх db_path без запроса мастер-пароля
+    storage = object.__new__(PasswordStorage)
+    storage.db_file = db_path
+    storage.conn = sqlite3.connect(db_path)
+    storage.cursor = storage.conn.cursor()
+    storage.crypto = AESEncryptor("test-password", b"1" * 16)
+    storage._cache = OrderedDict()
+    storage._legacy_password = None
+    storage._init_db()
+    return storage
+
+
 def test_aes_encrypt_decrypt_roundtrip():
     enc = AESEncryptor("test-password")
-    original = "секретная_строка"
-    encrypted = enc.encrypt(original)
-    assert isinstance(encrypted, str)
+    original = "секретная_строка".encode()
+    encrypted = enc.encrypt_bytes(original)
+    assert isinstance(encrypted, bytes)
     assert encrypted != original
 
-    decrypted = enc.decrypt(encrypted)
+    decrypted = enc.decrypt_bytes(encrypted)
     assert decrypted == original
 
 
+def test_aes_encryptor_reuses_cipher_with_fresh_nonces():
+    enc = AESEncryptor("test-password", b"1" * 16)
+    encrypted = [enc.encrypt_bytes(b"value") for _ in range(50)]
+
+    nonces = {e[1:13] for e in encrypted}
+    assert len(nonces) == len(encrypted)
+    assert all(enc.decrypt_bytes(e) == b"value" for e in encrypted)
+
+
 def test_aes_decrypt_invalid_data_raises():
     enc = AESEncryptor("test-password")
-    bad_data = "not-base64!"
+    bad_data = b"not-encrypted!"
     try:
-        enc.decrypt(bad_data)
+        enc.decrypt_bytes(bad_data)
         raised = False
-    except Exception:
+    except ValueError:
         raised = True
     assert raised
 
 
+
+def test_aes_decrypt_bytes_rejects_legacy_layout():
+    enc = AESEncryptor("test-password", b"1" * 16)
+    cipher = AES.new(enc.key, AES.MODE_GCM)
+    ciphertext, tag = cipher.encrypt_and_digest(b"value")
+    try:
+        enc.decrypt_bytes(cipher.nonce + tag + ciphertext)
+        raised = False
+    except ValueError:
+        raised = True
+    assert raised
+
 def test_password_generator_segmented_basic():
     gen = PasswordGenerator(DummyLogger())
     pwd = gen.generate_segmented_password(segment_length=4, segments_amount=3, separator="-")
@@ -56,15 +101,7 @@ def test_password_generator_semantic_returns_words():
 
 def test_password_storage_get_unknown_returns_none():
     with tempfile.TemporaryDirectory() as tmp:
-        db_path = os.path.join(tmp, "passwords2.db")
-        storage = object.__new__(PasswordStorage)
-        storage.db_file = db_path
-        storage.salt_file = os.path.join(tmp, "vault_salt.bin")
-        storage.hash_file = os.path.join(tmp, "master_hash.txt")
-        storage.conn = sqlite3.connect(db_path)
-        storage.cursor = storage.conn.cursor()
-        storage.crypto = AESEncryptor("test-password", b"1" * 16)
-        storage._init_db()
+        storage = make_storage(os.path.join(tmp, "passwords2.db"))
 
         assert storage.get("no_such_service") is None
 
@@ -85,3 +122,224 @@ def test_log_storage_writes_row():
         conn.close()
 
         assert ("test_action", "service1") in rows
+
+
+def test_password_storage_save_many_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = make_storage(os.path.join(tmp, "passwords3.db"))
+
+        storage.save_many([("mail", "user", "pw1"), ("bank", "client", "pw2")])
+
+        assert storage.list_all() == ["bank", "mail"]
+        assert storage.get("bank") == ("client", "pw2")
+
+        storage.save("bank", "client", "pw3")
+        assert storage.get("bank") == ("client", "pw3")
+        storage.delete("bank")
+        assert storage.get("bank") is None
+
+        storage.close()
+
+
+def test_log_storage_log_many_writes_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "logs.db")
+        logs = LogStorage(log_file=log_path)
+        logs.log_many([("a1", "s1"), ("a2", "s2")])
+        logs.close()
+
+        conn = sqlite3.connect(log_path)
+        cur = conn.cursor()
+        cur.execute("SELECT action, service FROM logs")
+        rows = cur.fetchall()
+        conn.close()
+
+        assert rows == [("a1", "s1"), ("a2", "s2")]
+
+
+def test_password_storage_migrates_split_columns():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "passwords4.db")
+        crypto = AESEncryptor("test-password", b"1" * 16)
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE passwords (service TEXT PRIMARY KEY, login TEXT, password TEXT)")
+        conn.execute(
+            "INSERT INTO passwords VALUES (?, ?, ?)",
+            ("mail", base64.b64encode(crypto.encrypt_bytes(b"user")).decode(),
+             base64.b64encode(crypto.encrypt_bytes(b"pw1")).decode()),
+        )
+        conn.commit()
+        conn.close()
+
+        storage = make_storage(db_path)
+
+        columns = [c[1] for c in storage.conn.execute("PRAGMA table_info(passwords)")]
+        assert columns == ["service", "credentials"]
+        assert storage.get("mail") == ("user", "pw1")
+
+        storage.close()
+
+
+def test_log_storage_keeps_rows_after_failed_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "logs.db")
+        logs = LogStorage(log_file=log_path)
+        with logs._flush_lock:
+            logs.conn.execute("DROP TABLE logs")
+        logs.log("lost_without_retry", "s1")
+        time.sleep(logs.FLUSH_INTERVAL * 3)
+        assert logs._flusher.is_alive()
+
+        with logs._flush_lock:
+            logs.conn.execute("CREATE TABLE logs (timestamp TEXT, action TEXT, service TEXT)")
+        logs.log("after_recovery", "s2")
+        logs.close()
+        logs.close()
+
+        conn = sqlite3.connect(log_path)
+        rows = conn.execute("SELECT action, service FROM logs").fetchall()
+        conn.close()
+
+        assert rows == [("lost_without_retry", "s1"), ("after_recovery", "s2")]
+
+
+
+def test_log_storage_rejects_entries_after_close():
+    with tempfile.TemporaryDirectory() as tmp:
+        logs = LogStorage(log_file=os.path.join(tmp, "logs.db"))
+        logs.close()
+        for write in (lambda: logs.log("late", "s1"),
+                      lambda: logs.log_many([("late", "s1")])):
+            try:
+                write()
+                raised = False
+            except sqlite3.ProgrammingError:
+                raised = True
+            assert raised
+
+def test_password_generator_semantic_looks_past_similar_top_candidates():
+    gen = PasswordGenerator(DummyLogger())
+    anagrams = ["".join(p) for p in itertools.permutations("rate")]
+    gen._set_word_list(["stone", *anagrams, "mood"])
+
+    _, _, words = gen.generate_semantic_password(theme_word="stone", password_length=3)
+
+    assert words == ["stone", anagrams[0], "mood"]
+
+
+def _unpruned_semantic_words(gen, theme, password_length, max_similarity=0.7, min_similarity=0.2):
+    index = gen._index
+    theme_letters = _letter_set(theme)
+    scores = _score_candidates(
+        index.matrix @ _simple_vector(theme), len(theme), len(theme_letters),
+        _letter_masks((theme_letters,), index.alphabet)[0],
+        index.lengths, index.letters, index.masks,
+    )
+    selected = [theme]
+    for i in np.argsort(-scores, kind="stable"):
+        if len(selected) >= password_length:
+            break
+        word = index.words[i]
+        if not (min_similarity <= scores[i] <= max_similarity) or word.lower() == theme.lower():
+            continue
+        if all(gen._semantic_distance(w, word) <= max_similarity * 1.2 for w in selected):
+            selected.append(word)
+    return selected
+
+
+def test_score_candidates_matches_semantic_distance():
+    gen = PasswordGenerator(DummyLogger())
+    gen._set_word_list(gen._get_default_words() + ["кошка", "кошки", "река", "рука"])
+    index = gen._index
+
+    for theme in ("river", "Moon", "кошка", "zzz"):
+        theme_letters = _letter_set(theme)
+        scores = _score_candidates(
+            index.matrix @ _simple_vector(theme), len(theme), len(theme_letters),
+            _letter_masks((theme_letters,), index.alphabet)[0],
+            index.lengths, index.letters, index.masks,
+        )
+        expected = [gen._semantic_distance(theme, word) for word in index.words]
+        assert np.allclose(scores, expected, rtol=0, atol=1e-6)
+
+
+def test_random_chars_returns_count_chars_from_alphabet():
+    for alphabet in (b"aeiou", b"bcdfghjklmnpqrstvwxyz", bytes(range(256))):
+        for count in (0, 1, 7, 1000):
+            chars = _random_chars(alphabet, count)
+            assert len(chars) == count
+            assert set(chars) <= set(alphabet)
+
+
+def test_semantic_pruning_selects_same_words_as_full_scoring():
+    gen = PasswordGenerator(DummyLogger())
+    gen._set_word_list(gen._get_default_words())
+
+    for theme in gen.word_list:
+        expected = _unpruned_semantic_words(gen, theme, 3)
+        if len(expected) < 3:
+            continue
+        _, _, words = gen.generate_semantic_password(theme_word=theme, password_length=3)
+        assert words == expected
+
+
+def answer_getpass(monkeypatch, *answers):
+    answers = list(answers)
+    monkeypatch.setattr(getpass, "getpass", lambda prompt="": answers.pop(0))
+
+
+def test_password_storage_creates_and_reopens_vault(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    answer_getpass(monkeypatch, "master", "master")
+    storage = PasswordStorage("passwords.db")
+    storage.save("mail", "user", "pw1")
+    storage.close()
+
+    assert not (tmp_path / "master_hash.bin").exists()
+    assert (tmp_path / "vault_verifier.bin").exists()
+
+    answer_getpass(monkeypatch, "wrong", "master")
+    storage = PasswordStorage("passwords.db")
+    assert storage.get("mail") == ("user", "pw1")
+    storage.close()
+    assert "Неверный пароль" in capsys.readouterr().out
+
+
+def test_password_storage_opens_baseline_vault(tmp_path, monkeypatch, capsys):
+    # Хранилище в том виде, в каком его оставляла первая версия приложения
+    monkeypatch.chdir(tmp_path)
+    salt = os.urandom(16)
+    key = PBKDF2(b"master", salt, dkLen=32, count=100000)
+
+    def encrypt_legacy(text):
+        cipher = AES.new(key, AES.MODE_GCM)
+        ciphertext, tag = cipher.encrypt_and_digest(text.encode())
+        return base64.b64encode(cipher.nonce + tag + ciphertext).decode()
+
+    (tmp_path / "vault_salt.bin").write_bytes(salt)
+    (tmp_path / "master_hash.txt").write_text(hashlib.sha256(b"master").hexdigest())
+    conn = sqlite3.connect("passwords.db")
+    conn.execute("CREATE TABLE passwords (service TEXT PRIMARY KEY, "
+                 "login TEXT NOT NULL, password TEXT NOT NULL)")
+    conn.execute("INSERT INTO passwords VALUES (?, ?, ?)",
+                 ("mail", encrypt_legacy("user"), encrypt_legacy("pw1")))
+    conn.commit()
+    conn.close()
+
+    answer_getpass(monkeypatch, "wrong", "master")
+    storage = PasswordStorage("passwords.db")
+    assert storage.get("mail") == ("user", "pw1")
+    storage.close()
+    assert "Неверный пароль" in capsys.readouterr().out
+
+    # Хранилище переведено на текущий KDF, хеш мастер-пароля удален
+    assert not (tmp_path / "master_hash.txt").exists()
+    assert (tmp_path / "vault_salt.bin").read_bytes() != salt
+    assert json.loads((tmp_path / "vault_kdf.json").read_text()) == DEFAULT_KDF_PARAMS
+    assert (tmp_path / "vault_verifier.bin").exists()
+
+    answer_getpass(monkeypatch, "master")
+    storage = PasswordStorage("passwords.db")
+    assert storage.get("mail") == ("user", "pw1")
+    storage.close()
+